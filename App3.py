@@ -1,16 +1,35 @@
+from __future__ import annotations
+
 import streamlit as st
 import json
-import pandas as pd
+import os
+import atexit
+import argparse
 import base64
+import bisect
+import copy
+import functools
+import heapq
+import importlib.util
 import io
+import itertools
 import random
+import re
+import sys
+import tempfile
+import threading
 import time
-import smtplib
-from datetime import datetime
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
-import requests
-from email.message import EmailMessage
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+from urllib.parse import quote
+
+# pandas, requests, smtplib and email are imported on first use so the login
+# page and team dashboard render without paying for them in a fresh process.
+if TYPE_CHECKING:
+    import pandas as pd
 
 class OTPManager:
     """Handle OTP generation and email sending for APH portal"""
@@ -27,18 +46,32 @@ class OTPManager:
         self.app_password = "ipes azzy jxbf cnzj"
         self.smtp_server = "smtp.gmail.com"
         self.smtp_port = 587
+        self.use_tls = True
+    
+    _AUTHORIZED_LOOKUP = frozenset(auth_email.lower() for auth_email in AUTHORIZED_EMAILS)
     
     def is_authorized_email(self, email: str) -> bool:
-        return email.lower() in [auth_email.lower() for auth_email in self.AUTHORIZED_EMAILS]
+        return email.strip().lower() in self._AUTHORIZED_LOOKUP
     
     def generate_otp(self) -> str:
         return "".join([str(random.randint(0, 9)) for _ in range(6)])
     
-    def send_otp_email(self, to_email: str, otp: str) -> tuple[bool, str]:
-        try:
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+    def open_smtp(self):
+        """Open an SMTP session with the configured server and credentials"""
+        import smtplib
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        if self.use_tls:
             server.starttls()
+        if self.app_password:
             server.login(self.from_mail, self.app_password)
+        return server
+    
+    def send_otp_email(self, to_email: str, otp: str) -> tuple[bool, str]:
+        from email.message import EmailMessage
+        
+        try:
+            server = self.open_smtp()
             
             msg = EmailMessage()
             msg['Subject'] = "🐉 Dragonboat Portal - Your OTP Code"
@@ -100,12 +133,558 @@ Dragonboat Team Portal Security System"""
         else:
             return False, "Invalid OTP code"
 
+class ProgressEventLog:
+    """Append-only log of task status transitions, kept in memory as integer-coded columns
+
+    On disk it is one JSON line per event, so each session appends only the events it
+    recorded instead of rewriting the history other sessions also append to.
+    """
+    
+    STATUSES = ["Pending", "In Progress", "Completed"]
+    COLUMNS = {"portal": "i", "member": "i", "task": "i", "prev": "b", "status": "b", "ts": "d"}
+    
+    def __init__(self, filename="portal_data_events.json"):
+        self.filename = filename
+        self._reset()
+        self.load()
+    
+    def _reset(self):
+        self.codes = {"portal": [], "member": [], "task": []}
+        self._code_lookup = {"portal": {}, "member": {}, "task": {}}
+        self.columns = {name: array(typecode) for name, typecode in self.COLUMNS.items()}
+        self.portal_rows: Dict[int, array] = {}
+    
+    def load(self):
+        """Load events from file if present, accepting the older single-document column format"""
+        self.rewrite_needed = False  # set when the file must be replaced rather than appended to
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                text = f.read()
+            if text.lstrip().startswith("{"):
+                self._load_columns(json.loads(text))
+                self.rewrite_needed = True
+            else:
+                rows = []
+                for line in text.splitlines():
+                    try:
+                        rows.append(tuple(json.loads(line)))
+                    except ValueError:
+                        continue  # blank, or torn by a crash mid-append
+                # Sessions append concurrently, so lines are only roughly in time order
+                self._rebuild(sorted(rows, key=lambda row: row[5]))
+        except FileNotFoundError:
+            pass
+        except Exception:
+            self._reset()
+            self.rewrite_needed = True
+        self._written = self._released = len(self)
+    
+    def _load_columns(self, stored: Dict):
+        for kind in self.codes:
+            self.codes[kind] = list(stored["codes"][kind])
+            self._code_lookup[kind] = {value: i for i, value in enumerate(self.codes[kind])}
+        for name, typecode in self.COLUMNS.items():
+            column = array(typecode)
+            column.frombytes(base64.b64decode(stored["columns"][name]))
+            self.columns[name] = column
+        for row, portal in enumerate(self.columns["portal"]):
+            self.portal_rows.setdefault(portal, array("q")).append(row)
+    
+    def release(self):
+        """Let every event recorded so far go out with the next write"""
+        self._released = len(self)
+    
+    def drain(self) -> str:
+        """JSON lines for released events not yet written, which are then counted as written"""
+        lines = "".join(json.dumps(row) + "\n" for row in self.rows(self._written, self._released))
+        self._written = self._released
+        return lines
+    
+    def to_jsonl(self) -> str:
+        """Every released event as JSON lines, for replacing the whole file"""
+        self._written = self._released
+        self.rewrite_needed = False
+        return "".join(json.dumps(row) + "\n" for row in self.rows(0, self._released))
+    
+    def __len__(self) -> int:
+        return len(self.columns["ts"])
+    
+    def _code(self, kind: str, value: str) -> int:
+        lookup = self._code_lookup[kind]
+        if value not in lookup:
+            lookup[value] = len(self.codes[kind])
+            self.codes[kind].append(value)
+        return lookup[value]
+    
+    def _status_code(self, status: Optional[str]) -> int:
+        return self.STATUSES.index(status) if status in self.STATUSES else -1
+    
+    def _rebuild(self, rows: List[tuple]):
+        """Replace the log with (portal, member, task, prev, status, ts) rows of names and status strings"""
+        self._reset()
+        for role, member, task, prev, status, ts in rows:
+            self.record(role, member, task, prev, status, ts)
+    
+    def rows(self, start: int = 0, stop: int = None) -> Iterator[tuple]:
+        codes, columns = self.codes, self.columns
+        status = lambda code: self.STATUSES[code] if code >= 0 else None
+        for i in range(start, len(self) if stop is None else stop):
+            yield (codes["portal"][columns["portal"][i]], codes["member"][columns["member"][i]],
+                   codes["task"][columns["task"][i]], status(columns["prev"][i]),
+                   status(columns["status"][i]), columns["ts"][i])
+    
+    def truncate(self, length: int):
+        """Drop events recorded after the first `length`"""
+        if length < len(self):
+            self._rebuild(list(self.rows(0, length)))
+            self._written = min(self._written, length)
+            self._released = min(self._released, length)
+    
+    def compact(self, keep: Callable[[str, str, str], bool]) -> int:
+        """Drop events whose (portal, member, task) no longer exists; returns the number removed"""
+        before = len(self)
+        self._rebuild([row for row in self.rows() if keep(row[0], row[1], row[2])])
+        self._written = self._released = 0
+        self.rewrite_needed = True
+        return before - len(self)
+    
+    def record(self, role: str, member: str, task: str, prev: Optional[str], status: str, ts: float = None):
+        """Append one status transition"""
+        ts = time.time() if ts is None else ts
+        columns = self.columns
+        if len(columns["ts"]) and ts < columns["ts"][-1]:
+            ts = columns["ts"][-1]  # keep the time column sorted for range queries
+        
+        portal = self._code("portal", role)
+        columns["portal"].append(portal)
+        columns["member"].append(self._code("member", member))
+        columns["task"].append(self._code("task", task))
+        columns["prev"].append(self._status_code(prev))
+        columns["status"].append(self._status_code(status))
+        columns["ts"].append(ts)
+        self.portal_rows.setdefault(portal, array("q")).append(len(columns["ts"]) - 1)
+    
+    def query(self, role: str, start: float = None, end: float = None) -> Dict:
+        """Return numpy columns for a portal's events with start <= ts < end"""
+        import numpy as np
+        
+        def as_numpy(column: array):
+            dtype = np.dtype(column.typecode)
+            return np.frombuffer(column, dtype=dtype) if len(column) else np.empty(0, dtype=dtype)
+        
+        code = self._code_lookup["portal"].get(role)
+        rows = as_numpy(self.portal_rows.get(code, array("q")))
+        ts = as_numpy(self.columns["ts"])[rows]
+        lo = 0 if start is None else np.searchsorted(ts, start, side="left")
+        hi = len(ts) if end is None else np.searchsorted(ts, end, side="left")
+        rows = rows[lo:hi]
+        
+        result = {"ts": ts[lo:hi]}
+        for name in ("member", "task", "prev", "status"):
+            result[name] = as_numpy(self.columns[name])[rows]
+        return result
+    
+    def daily_completions(self, role: str, start: float, end: float):
+        """Net completions per local day in [start, end) as (day timestamps, counts)"""
+        import numpy as np
+        
+        events = self.query(role, start, end)
+        completed = self.STATUSES.index("Completed")
+        delta = (events["status"] == completed).astype(np.int64) - (events["prev"] == completed).astype(np.int64)
+        
+        # Bucket by local midnights computed per day so windows crossing a DST change stay aligned
+        first_day = datetime.fromtimestamp(start).date()
+        last_day = datetime.fromtimestamp(max(end - 1e-6, start)).date()
+        days = np.array([
+            datetime.combine(first_day + timedelta(days=i), datetime.min.time()).timestamp()
+            for i in range((last_day - first_day).days + 1)
+        ])
+        day_index = np.searchsorted(days, events["ts"], side="right") - 1
+        counts = np.bincount(day_index, weights=delta, minlength=len(days))[:len(days)].astype(np.int64)
+        return days, counts
+
+class AnnouncementArchive:
+    """On-disk archive tier for announcements, one timestamp-prefixed JSON line per item"""
+    
+    def __init__(self, directory="portal_data_archive"):
+        self.directory = Path(directory)
+        self._index: Dict[str, tuple] = {}  # role -> (file signature, sorted [(timestamp, byte offset)])
+        resources = shared_resources()  # one lock per directory, shared by every session
+        with resources["lock"]:
+            self._lock = resources["archive_locks"].setdefault(str(self.directory.resolve()), threading.RLock())
+    
+    def _path(self, role: str) -> Path:
+        return self.directory / f"{quote(role, safe='')}.jsonl"
+    
+    def _entries(self, role: str) -> List[tuple]:
+        """Return the timestamp index for a portal, rescanning line prefixes when the file changed on disk"""
+        path = self._path(role)
+        try:
+            stat = path.stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            signature = None
+        
+        cached = self._index.get(role)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        entries = {}
+        if signature is not None:
+            with open(path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        # A crash mid-archive can leave an item appended twice; the first copy wins
+                        entries.setdefault(line.split(b"\t", 1)[0].decode(), offset)
+                    offset += len(line)
+        self._index[role] = (signature, sorted(entries.items()))
+        return self._index[role][1]
+    
+    def count(self, role: str) -> int:
+        with self._lock:
+            return len(self._entries(role))
+    
+    def contains(self, role: str, timestamp: str) -> bool:
+        with self._lock:
+            return self._find(role, timestamp) is not None
+    
+    def append(self, role: str, announcements: List[Dict]):
+        """Move announcements into the archive, skipping any another session already archived"""
+        with self._lock:
+            new = [ann for ann in announcements if self._find(role, ann["timestamp"]) is None]
+            if not new:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(role), 'ab') as f:
+                for ann in new:
+                    f.write(f"{ann['timestamp']}\t{json.dumps(ann, ensure_ascii=False)}\n".encode('utf-8'))
+    
+    def _read(self, role: str, offsets: List[int]) -> List[Dict]:
+        items = []
+        with open(self._path(role), 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                items.append(json.loads(f.readline().split(b"\t", 1)[1]))
+        return items
+    
+    def get(self, role: str, start: int, stop: int) -> List[Dict]:
+        """Return archived announcements newest first, positions start..stop"""
+        with self._lock:
+            entries = self._entries(role)
+            count = len(entries)
+            start, stop = max(start, 0), min(stop, count)
+            if start >= stop:
+                return []
+            return self._read(role, [offset for _, offset in reversed(entries[count - stop:count - start])])
+    
+    def _find(self, role: str, timestamp: str) -> Optional[int]:
+        entries = self._entries(role)
+        i = bisect.bisect_left(entries, (timestamp,))
+        if i == len(entries) or entries[i][0] != timestamp:
+            return None
+        return i
+    
+    def position(self, role: str, timestamp: str) -> Optional[int]:
+        """Newest-first position of an archived announcement"""
+        with self._lock:
+            i = self._find(role, timestamp)
+            return None if i is None else len(self._entries(role)) - 1 - i
+    
+    def remove(self, role: str, timestamp: str) -> bool:
+        """Delete an archived announcement (every copy of it) by timestamp"""
+        with self._lock:
+            if self._find(role, timestamp) is None:
+                return False
+            
+            path = self._path(role)
+            prefix = f"{timestamp}\t".encode('utf-8')
+            with open(path, 'rb') as f:
+                lines = [line for line in f if not line.startswith(prefix)]
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, 'wb') as f:
+                f.writelines(lines)
+            tmp_path.replace(path)
+            return True
+    
+    def remove_portal(self, role: str):
+        with self._lock:
+            self._index.pop(role, None)
+            self._path(role).unlink(missing_ok=True)
+
+class DeadlineIndex:
+    """Sorted (deadline, portal, task) entries for completable tasks with a deadline"""
+    
+    def __init__(self):
+        self.entries: List[tuple] = []
+    
+    def add(self, deadline: str, role: str, task: str):
+        if deadline:
+            bisect.insort(self.entries, (deadline, role, task))
+    
+    def remove(self, deadline: str, role: str, task: str):
+        if not deadline:
+            return
+        i = bisect.bisect_left(self.entries, (deadline, role, task))
+        if i < len(self.entries) and self.entries[i] == (deadline, role, task):
+            del self.entries[i]
+    
+    def remove_portal(self, role: str):
+        self.entries = [entry for entry in self.entries if entry[1] != role]
+    
+    def between(self, start: str, end: str) -> List[tuple]:
+        """Entries with start <= deadline <= end (ISO date strings)"""
+        lo = bisect.bisect_left(self.entries, (start,))
+        hi = bisect.bisect_right(self.entries, (end, chr(0x10FFFF)))
+        return self.entries[lo:hi]
+
+class SearchIndex:
+    """Inverted index from words to members, tasks and announcements across portals"""
+    
+    def __init__(self):
+        self.postings: Dict[str, Dict[tuple, float]] = {}  # word -> doc key -> weight
+        self.vocabulary: List[str] = []  # sorted words, for prefix matching
+        self.docs: Dict[tuple, Dict] = {}  # (kind, portal, id) -> hit info
+        self._doc_words: Dict[tuple, Dict[str, float]] = {}
+        self._portal_docs: Dict[str, set] = {}
+    
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return re.findall(r"\w+", (text or "").casefold())
+    
+    def add(self, key: tuple, fields: List[tuple], info: Dict):
+        """Index a document from (text, weight) fields, replacing any previous version"""
+        self.remove(key)
+        words: Dict[str, float] = {}
+        for text, weight in fields:
+            for word in self.tokenize(text):
+                words[word] = words.get(word, 0) + weight
+        
+        for word, weight in words.items():
+            if word not in self.postings:
+                self.postings[word] = {}
+                bisect.insort(self.vocabulary, word)
+            self.postings[word][key] = weight
+        self.docs[key] = info
+        self._doc_words[key] = words
+        self._portal_docs.setdefault(key[1], set()).add(key)
+    
+    def remove(self, key: tuple):
+        words = self._doc_words.pop(key, None)
+        if words is None:
+            return
+        for word in words:
+            posting = self.postings[word]
+            del posting[key]
+            if not posting:
+                del self.postings[word]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, word)]
+        del self.docs[key]
+        self._portal_docs[key[1]].discard(key)
+    
+    def remove_portal(self, role: str):
+        for key in list(self._portal_docs.get(role, ())):
+            self.remove(key)
+        self._portal_docs.pop(role, None)
+    
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Rank documents matching every query word; words also match as prefixes at half weight"""
+        scores: Optional[Dict[tuple, float]] = None
+        for term in set(self.tokenize(query)):
+            term_scores: Dict[tuple, float] = {}
+            i = bisect.bisect_left(self.vocabulary, term)
+            while i < len(self.vocabulary) and self.vocabulary[i].startswith(term):
+                word = self.vocabulary[i]
+                factor = 1.0 if word == term else 0.5
+                for key, weight in self.postings[word].items():
+                    term_scores[key] = max(term_scores.get(key, 0), weight * factor)
+                i += 1
+            
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+            if not scores:
+                return []
+        
+        ranked = heapq.nlargest(limit, (scores or {}).items(), key=lambda item: item[1])
+        return [dict(self.docs[key], score=score) for key, score in ranked]
+
+class WriteBehindWriter:
+    """Background thread that coalesces save requests into durable group commits"""
+    
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Callable[[], str]] = {}  # path -> serializer for its latest state
+        self._appends: Dict[str, List[Callable[[], str]]] = {}  # path -> callbacks returning new lines
+        self._unwritten: Dict[str, str] = {}  # path -> lines a failed append still owes the file
+        self._requested = 0
+        self._committed = 0
+        self._flush_target = 0  # flush() callers want everything up to this request committed now
+        self._closed = False
+        self._errors: List[str] = []
+        self._thread = threading.Thread(target=self._run, name="portal-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def mark_dirty(self, path: str, serialize: Callable[[], str]):
+        """Schedule `path` to be rewritten with `serialize()` at the next commit"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+            self._pending[path] = serialize
+            self._requested += 1
+            self._cond.notify_all()
+    
+    def mark_append(self, path: str, drain: Callable[[], str]):
+        """Schedule `drain()` to be appended to `path` at the next commit, after any rewrite of it"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+            drains = self._appends.setdefault(path, [])
+            if drain not in drains:
+                drains.append(drain)
+            self._requested += 1
+            self._cond.notify_all()
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Commit everything requested so far without waiting out the latency window"""
+        with self._cond:
+            target = self._requested
+            if self._committed >= target:
+                return True
+            self._flush_target = max(self._flush_target, target)
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    def close(self, timeout: float = None):
+        """Flush pending writes and stop the writer thread"""
+        if self._closed:
+            return
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+    
+    def pop_errors(self) -> List[str]:
+        """Return and clear errors from writes that failed since the last call"""
+        with self._cond:
+            errors, self._errors = self._errors, []
+        return errors
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._appends or self._closed)
+                if not (self._pending or self._appends):
+                    return
+                # Let a burst of mutations pile up so they land in a single write
+                deadline = time.monotonic() + self.latency
+                while not (self._flush_target > self._committed or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                appends, self._appends = self._appends, {}
+                target = self._requested
+            
+            errors = []
+            for path, serialize in batch.items():
+                try:
+                    self._write(path, serialize())
+                except Exception as e:
+                    errors.append(f"{path}: {e}")
+            for path, drains in appends.items():
+                content = self._unwritten.pop(path, "")
+                try:
+                    content += "".join(drain() for drain in drains)
+                    self._append(path, content)
+                except Exception as e:
+                    self._unwritten[path] = content  # retried ahead of the next append to this path
+                    errors.append(f"{path}: {e}")
+            
+            with self._cond:
+                self._errors.extend(errors)
+                self._committed = target
+                self._cond.notify_all()
+    
+    @staticmethod
+    def _write(path: str, content: str):
+        target = Path(path)
+        tmp_path = Path(path + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(target)
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(target.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    
+    @staticmethod
+    def _append(path: str, content: str):
+        if not content:
+            return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+@st.cache_resource(show_spinner=False)
+def shared_resources() -> Dict:
+    """Process-wide registry that survives Streamlit reruns, so sessions share writers and locks"""
+    return {"lock": threading.Lock(), "writers": {}, "archive_locks": {}}
+
+def shared_writer(path: str, latency: float) -> WriteBehindWriter:
+    """Return the writer for a data file, shared by every session in this process"""
+    resources = shared_resources()
+    key = str(Path(path).resolve())
+    with resources["lock"]:
+        writer = resources["writers"].get(key)
+        if writer is None or writer.closed:
+            writer = resources["writers"][key] = WriteBehindWriter(latency)
+        return writer
+
+def synchronized(method):
+    """Run a DataManager method under its lock so the writer never serializes a half-applied change"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class DataManager:
     """Handle data persistence and operations - fully dynamic portal support"""
     
-    def __init__(self, filename="portal_data.json"):
+    HOT_ANNOUNCEMENTS = 20  # per portal; older announcements move to the archive tier
+    
+    def __init__(self, filename="portal_data.json", write_latency: float = 0.2):
         self.filename = filename
+        self._lock = threading.RLock()
+        self.writer = shared_writer(filename, write_latency)
+        self._batch_depth = 0
+        self._batch_dirty = False
+        self._batch_archive_roles = set()
+        self._batch_archive_removals: List[tuple] = []  # (role, timestamp or None for the whole portal)
+        self._versions = itertools.count(1)
+        self._portal_versions: Dict[str, int] = {}  # role -> version of its last member/task/progress change
         self.data = self.load_data()
+        self.events = ProgressEventLog(str(Path(filename).with_name(Path(filename).stem + "_events.json")))
+        self._events_dirty = False
+        self.archive = AnnouncementArchive(Path(filename).with_name(Path(filename).stem + "_archive"))
+        self._drop_archived_duplicates()
+        self._rebuild_indexes()
     
     def load_data(self) -> Dict:
         """Load data from file or create minimal structure"""
@@ -124,12 +703,14 @@ class DataManager:
             "resources": {},
             "members": {"APH": ["admin"]},  # Only APH admin by default
             "user_progress": {},
-            "announcements": {}
+            "announcements": {},
+            "contacts": {},
+            "reminders": {}
         }
     
     def _ensure_structure(self, data):
         """Ensure basic keys exist, but don't hardcode specific portals"""
-        required_keys = ["passwords", "resources", "members", "user_progress", "announcements"]
+        required_keys = ["passwords", "resources", "members", "user_progress", "announcements", "contacts", "reminders"]
         
         for key in required_keys:
             if key not in data:
@@ -139,6 +720,80 @@ class DataManager:
         if "APH" not in data["members"]:
             data["members"]["APH"] = ["admin"]
     
+    @staticmethod
+    def _name_key(name: str) -> str:
+        return name.strip().casefold()
+    
+    def _rebuild_indexes(self):
+        """Build case-insensitive name indexes over members and tasks"""
+        # Lists, because files written before these indexes may hold names that differ only by case
+        self._member_index: Dict[str, Dict[str, List[str]]] = {}  # role -> key -> member names
+        self._task_index: Dict[str, Dict[str, List[Dict]]] = {}  # role -> key -> resources
+        self.deadlines = DeadlineIndex()
+        self._search_index: Optional[SearchIndex] = None  # built on first search
+        
+        for role, members in self.data["members"].items():
+            index = self._member_index[role] = {}
+            for member in members:
+                index.setdefault(self._name_key(member), []).append(member)
+        for role, resources in self.data["resources"].items():
+            index = self._task_index[role] = {}
+            for resource in resources:
+                index.setdefault(self._name_key(resource.get("name", "")), []).append(resource)
+                if resource.get("requires_completion", True):
+                    self.deadlines.add(resource.get("deadline"), role, resource["name"])
+    
+    def _index_member(self, role: str, name: str):
+        if self._search_index is not None:
+            self._search_index.add(("member", role, name), [(name, 3)],
+                                   {"kind": "member", "portal": role, "id": name, "title": name, "snippet": ""})
+    
+    def _index_task(self, role: str, resource: Dict):
+        if self._search_index is not None:
+            name = resource.get("name", "")
+            self._search_index.add(("task", role, name), [(name, 3), (resource.get("description", ""), 1)],
+                                   {"kind": "task", "portal": role, "id": name, "title": name,
+                                    "snippet": resource.get("description", "")[:120]})
+    
+    def _index_announcement(self, role: str, ann: Dict):
+        if self._search_index is not None:
+            self._search_index.add(("announcement", role, ann["timestamp"]),
+                                   [(ann.get("title", ""), 2), (ann.get("content", ""), 1)],
+                                   {"kind": "announcement", "portal": role, "id": ann["timestamp"],
+                                    "title": ann.get("title", ""), "snippet": ann.get("content", "")[:120]})
+    
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Ranked hits for a query across every portal's members, tasks and announcements"""
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex()
+                for role, members in self.data["members"].items():
+                    for member in members:
+                        self._index_member(role, member)
+                for role, resources in self.data["resources"].items():
+                    for resource in resources:
+                        self._index_task(role, resource)
+                for role in self.data["announcements"]:
+                    for ann in self.get_announcements(role):
+                        self._index_announcement(role, ann)
+            return self._search_index.search(query, limit)
+    
+    def get_member(self, role: str, name: str) -> Optional[str]:
+        """Return the stored spelling of a member name, preferring an exact match over a case-insensitive one"""
+        candidates = self._member_index.get(role, {}).get(self._name_key(name), [])
+        return next((m for m in candidates if m == name.strip()), next(iter(candidates), None))
+    
+    def get_task(self, role: str, name: str) -> Optional[Dict]:
+        """Return the resource with this name, preferring an exact match over a case-insensitive one"""
+        candidates = self._task_index.get(role, {}).get(self._name_key(name), [])
+        return next((r for r in candidates if r["name"] == name.strip()), next(iter(candidates), None))
+    
+    def _unindex(self, index: Dict[str, Dict[str, List]], role: str, name: str, entry):
+        entries = index.get(role, {}).get(self._name_key(name), [])
+        entries[:] = [e for e in entries if e is not entry]
+        if not entries:
+            index.get(role, {}).pop(self._name_key(name), None)
+    
     def _ensure_portal_structure(self, role: str):
         """Ensure a portal has all required data structures"""
         for key in ["resources", "members", "user_progress", "announcements"]:
@@ -149,52 +804,160 @@ class DataManager:
                     self.data[key][role] = {}
     
     def save_data(self) -> bool:
+        """Queue the current state for the background writer; failures surface via pop_write_errors"""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return True
         try:
-            tmp_path = Path(self.filename + ".tmp")
-            with open(tmp_path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, indent=2, default=str, ensure_ascii=False)
-            tmp_path.replace(Path(self.filename))
+            self.writer.mark_dirty(self.filename, self._serialize_data)
+            if self._events_dirty:
+                self.events.release()
+                if self.events.rewrite_needed:
+                    self.writer.mark_dirty(self.events.filename, self._serialize_events)
+                else:
+                    self.writer.mark_append(self.events.filename, self._drain_events)
+                self._events_dirty = False
             return True
         except Exception as e:
             if hasattr(st, 'error'):
                 st.error(f"Save failed: {e}")
             return False
     
+    def _serialize_data(self) -> str:
+        with self._lock:
+            return json.dumps(self.data, indent=2, default=str, ensure_ascii=False)
+    
+    def _serialize_events(self) -> str:
+        with self._lock:
+            return self.events.to_jsonl()
+    
+    def _drain_events(self) -> str:
+        with self._lock:
+            return self.events.drain()
+    
+    @contextmanager
+    def batch(self):
+        """Apply many mutations as one transaction: a single save on success, rolled back on error"""
+        with self._lock:
+            snapshot = copy.deepcopy(self.data)
+            events_length = len(self.events)
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                self.data = snapshot
+                self.events.truncate(events_length)
+                self._rebuild_indexes()
+                for role in self.get_all_portals():
+                    self._touch(role)
+                if not self._batch_depth:
+                    self._batch_dirty = self._events_dirty = False
+                    self._batch_archive_roles.clear()
+                    self._batch_archive_removals.clear()
+                raise
+            self._batch_depth -= 1
+            
+            if not self._batch_depth:
+                # Archive changes are deferred to commit so a rollback never touches the files on disk
+                removals, self._batch_archive_removals = self._batch_archive_removals, []
+                for role, timestamp in removals:
+                    self._remove_archived(role, timestamp)
+                for role in sorted(self._batch_archive_roles):
+                    if role in self.data["announcements"]:
+                        self._archive_old_announcements(role)
+                self._batch_archive_roles.clear()
+                if self._batch_dirty:
+                    self._batch_dirty = False
+                    self.save_data()
+    
+    @synchronized
+    def compact(self) -> Dict[str, int]:
+        """Trim the event log to existing members and tasks and move announcement overflow to the archive"""
+        def exists(role: str, member: str, task: str) -> bool:
+            return (member in self.data["user_progress"].get(role, {})
+                    and self.get_task(role, task) is not None)
+        
+        removed_events = self.events.compact(exists)
+        archived = 0
+        for role in list(self.data["announcements"]):
+            before = len(self.data["announcements"][role])
+            self._archive_old_announcements(role)
+            archived += before - len(self.data["announcements"][role])
+        
+        self._events_dirty = True
+        self.save_data()
+        return {"events_removed": removed_events, "announcements_archived": archived}
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every queued save is durable on disk"""
+        return self.writer.flush(timeout)
+    
+    def pop_write_errors(self) -> List[str]:
+        """Errors from background writes since the last call"""
+        return self.writer.pop_errors()
+    
+    def close(self, timeout: float = None):
+        """Flush queued saves; the shared writer keeps running for other sessions and stops at exit"""
+        self.writer.flush(timeout)
+    
     def get_all_portals(self) -> List[str]:
         """Get all portal names (from passwords + APH)"""
         portals = set(self.data["passwords"].keys())
         portals.add("APH")
         return sorted(list(portals))
     
+    def _touch(self, role: str):
+        self._portal_versions[role] = next(self._versions)
+    
+    def portal_version(self, role: str) -> int:
+        """Changes whenever a portal's members, tasks or progress change"""
+        return self._portal_versions.get(role, 0)
+    
+    @synchronized
     def add_portal(self, role: str, password: str):
         """Add new portal with password"""
         self.data["passwords"][role] = password
         self._ensure_portal_structure(role)
+        self._touch(role)
         self.save_data()
     
-    def add_member(self, role: str, name: str):
-        """Add member to portal"""
+    @synchronized
+    def add_member(self, role: str, name: str) -> Optional[str]:
+        """Add member to portal, returning the stored name (an existing one if it differs only by case)"""
         name = name.strip()
         if not name:
-            return
+            return None
         
         self._ensure_portal_structure(role)
         
-        if name not in self.data["members"][role]:
-            self.data["members"][role].append(name)
-            self.data["user_progress"][role][name] = {}
-            
-            # Initialize progress for existing completable tasks
-            for resource in self.data["resources"][role]:
-                if resource.get("requires_completion", True):
-                    self.data["user_progress"][role][name][resource["name"]] = "Pending"
+        existing = self.get_member(role, name)
+        if existing is not None:
+            return existing
+        
+        self._member_index.setdefault(role, {})[self._name_key(name)] = [name]
+        self._index_member(role, name)
+        self.data["members"][role].append(name)
+        self.data["user_progress"][role][name] = {}
+        
+        # Initialize progress for existing completable tasks
+        for resource in self.data["resources"][role]:
+            if resource.get("requires_completion", True):
+                self.data["user_progress"][role][name][resource["name"]] = "Pending"
         
+        self._touch(role)
         self.save_data()
+        return name
     
-    def add_resource(self, role: str, name: str, url: str, desc: str, priority: str, deadline: str, requires_completion: bool = True):
-        """Add resource/task to portal"""
+    @synchronized
+    def add_resource(self, role: str, name: str, url: str, desc: str, priority: str, deadline: str, requires_completion: bool = True) -> bool:
+        """Add resource/task to portal; returns False if a task with this name (ignoring case) exists"""
+        name = name.strip()
         self._ensure_portal_structure(role)
         
+        if self.get_task(role, name) is not None:
+            return False
+        
         resource = {
             "name": name,
             "url": url,
@@ -205,6 +968,10 @@ class DataManager:
         }
         
         self.data["resources"][role].append(resource)
+        self._task_index.setdefault(role, {})[self._name_key(name)] = [resource]
+        self._index_task(role, resource)
+        if requires_completion:
+            self.deadlines.add(deadline, role, name)
         
         # Add to existing members' progress if completable
         if requires_completion:
@@ -213,14 +980,58 @@ class DataManager:
                     self.data["user_progress"][role][member] = {}
                 self.data["user_progress"][role][member][name] = "Pending"
         
+        self._touch(role)
+        self.save_data()
+        return True
+    
+    @synchronized
+    def set_member_email(self, role: str, name: str, email: str) -> bool:
+        """Set (or clear, with an empty email) the reminder address of an existing member"""
+        member = self.get_member(role, name)
+        if member is None:
+            return False
+        
+        contacts = self.data["contacts"].setdefault(role, {})
+        if email.strip():
+            contacts[member] = email.strip()
+        else:
+            contacts.pop(member, None)
         self.save_data()
+        return True
     
+    def last_reminded(self, role: str, member: str, task: str, deadline: str) -> Optional[str]:
+        """Date a reminder about this task and deadline was last sent to a member"""
+        sent = self.data["reminders"].get(role, {}).get(member, {}).get(task)
+        return sent["sent"] if sent and sent.get("deadline") == deadline else None
+    
+    @synchronized
+    def record_reminders(self, entries: List[tuple], day: str):
+        """Remember that reminders for (portal, member, task, deadline) entries went out on `day`"""
+        for role, member, task, deadline in entries:
+            member_reminders = self.data["reminders"].setdefault(role, {}).setdefault(member, {})
+            member_reminders[task] = {"deadline": deadline, "sent": day}
+        self.save_data()
+    
+    @synchronized
+    def ensure_member_progress(self, role: str, member: str):
+        """Make sure a member has a progress record in a portal"""
+        if member not in self.data["user_progress"].get(role, {}):
+            self.data["user_progress"].setdefault(role, {})[member] = {}
+    
+    @synchronized
     def update_progress(self, role: str, member: str, task: str, status: str):
         """Update member's task progress"""
         if (role in self.data["user_progress"] and member in self.data["user_progress"][role]):
-            self.data["user_progress"][role][member][task] = status
+            member_progress = self.data["user_progress"][role][member]
+            previous = member_progress.get(task, "Pending")
+            member_progress[task] = status
+            if previous != status:
+                self.events.record(role, member, task, previous, status)
+                self._events_dirty = True
+                self._touch(role)
             self.save_data()
     
+    @synchronized
     def add_announcement(self, role: str, title: str, content: str, image_data: str = None):
         """Add announcement to portal"""
         self._ensure_portal_structure(role)
@@ -232,51 +1043,135 @@ class DataManager:
             "timestamp": datetime.now().isoformat()
         }
         self.data["announcements"][role].append(announcement)
+        self._index_announcement(role, announcement)
+        self._archive_old_announcements(role)
         self.save_data()
     
+    def _drop_archived_duplicates(self):
+        """Drop hot announcements already in the archive, left behind if a crash hit between archiving and saving"""
+        for role, announcements in self.data["announcements"].items():
+            if announcements and self.archive.count(role):
+                announcements[:] = [ann for ann in announcements if not self.archive.contains(role, ann["timestamp"])]
+    
+    def _archive_old_announcements(self, role: str):
+        """Move announcements beyond the hot tier cap into the archive"""
+        if self._batch_depth:
+            self._batch_archive_roles.add(role)
+            return
+        announcements = self.data["announcements"][role]
+        overflow = len(announcements) - self.HOT_ANNOUNCEMENTS
+        if overflow > 0:
+            self.archive.append(role, announcements[:overflow])
+            del announcements[:overflow]
+    
+    def _remove_archived(self, role: str, timestamp: str = None) -> bool:
+        """Delete an archived announcement, or a portal's whole archive; inside a batch, queue it for commit"""
+        if self._batch_depth:
+            queued = self._batch_archive_removals
+            if (role, None) in queued or (role, timestamp) in queued:
+                return False
+            if timestamp is not None and not self.archive.contains(role, timestamp):
+                return False
+            queued.append((role, timestamp))
+            return True
+        if timestamp is None:
+            self.archive.remove_portal(role)
+            return True
+        return self.archive.remove(role, timestamp)
+    
+    def count_announcements(self, role: str) -> int:
+        """Count announcements in both tiers"""
+        return len(self.data["announcements"].get(role, [])) + self.archive.count(role)
+    
+    def announcement_position(self, role: str, timestamp: str) -> Optional[int]:
+        """Newest-first position of an announcement across both tiers"""
+        hot = self.data["announcements"].get(role, [])
+        i = bisect.bisect_left(hot, timestamp, key=lambda ann: ann["timestamp"])
+        if i < len(hot) and hot[i]["timestamp"] == timestamp:
+            return len(hot) - 1 - i
+        archived = self.archive.position(role, timestamp)
+        return None if archived is None else len(hot) + archived
+    
+    def get_announcements(self, role: str, start: int = 0, stop: int = None) -> List[Dict]:
+        """Get announcements newest first; the archive is only read past the hot tier"""
+        hot = self.data["announcements"].get(role, [])
+        stop = self.count_announcements(role) if stop is None else stop
+        
+        items = [hot[-1 - i] for i in range(max(start, 0), min(stop, len(hot)))]
+        if stop > len(hot):
+            items.extend(self.archive.get(role, max(start - len(hot), 0), stop - len(hot)))
+        return items
+    
+    @synchronized
     def remove_portal(self, role: str):
         """Remove portal and all associated data"""
-        for key in ["passwords", "resources", "members", "user_progress", "announcements"]:
+        for key in ["passwords", "resources", "members", "user_progress", "announcements", "contacts", "reminders"]:
             if role in self.data.get(key, {}):
                 del self.data[key][role]
+        self._remove_archived(role)
+        for index in (self._member_index, self._task_index):
+            index.pop(role, None)
+        self.deadlines.remove_portal(role)
+        if self._search_index is not None:
+            self._search_index.remove_portal(role)
+        self._touch(role)
         self.save_data()
     
+    @synchronized
     def remove_member(self, role: str, name: str):
         """Remove member from portal"""
-        if role in self.data["members"] and name in self.data["members"][role]:
-            self.data["members"][role].remove(name)
-            if role in self.data["user_progress"] and name in self.data["user_progress"][role]:
-                del self.data["user_progress"][role][name]
+        member = self.get_member(role, name)
+        if member is not None:
+            self._unindex(self._member_index, role, member, member)
+            self.data["members"][role].remove(member)
+            self.data["user_progress"].get(role, {}).pop(member, None)
+            self.data["contacts"].get(role, {}).pop(member, None)
+            self.data["reminders"].get(role, {}).pop(member, None)
+            if self._search_index is not None:
+                self._search_index.remove(("member", role, member))
+            self._touch(role)
             self.save_data()
     
+    @synchronized
     def remove_task(self, role: str, task_name: str):
         """Remove task from portal"""
-        task_name_clean = task_name.strip().lower()
-        if role in self.data.get("resources", {}):
-            self.data["resources"][role] = [
-                r for r in self.data["resources"][role]
-                if r.get("name", "").strip().lower() != task_name_clean
-            ]
+        resource = self.get_task(role, task_name)
+        if resource is not None:
+            self._unindex(self._task_index, role, resource["name"], resource)
+            resources = self.data["resources"][role]
+            del resources[next(i for i, r in enumerate(resources) if r is resource)]
+            self.deadlines.remove(resource.get("deadline"), role, resource["name"])
+            if self._search_index is not None:
+                self._search_index.remove(("task", role, resource["name"]))
             
             # Remove from progress tracking
             for member_progress in self.data.get("user_progress", {}).get(role, {}).values():
-                keys_to_delete = [k for k in list(member_progress.keys()) if k.strip().lower() == task_name_clean]
-                for k in keys_to_delete:
-                    del member_progress[k]
+                member_progress.pop(resource["name"], None)
+            for member_reminders in self.data["reminders"].get(role, {}).values():
+                member_reminders.pop(resource["name"], None)
             
+            self._touch(role)
             self.save_data()
 
-    def remove_announcement(self, role: str, title: str):
-        """Remove an announcement by title from a portal"""
-        if role in self.data.get("announcements", {}):
-            self.data["announcements"][role] = [
-                ann for ann in self.data["announcements"][role] 
-                if ann.get("title", "").strip().lower() != title.strip().lower()
-            ]
+    @synchronized
+    def remove_announcement(self, role: str, timestamp: str) -> bool:
+        """Remove an announcement from a portal by its timestamp"""
+        announcements = self.data.get("announcements", {}).get(role, [])
+        i = bisect.bisect_left(announcements, timestamp, key=lambda ann: ann["timestamp"])
+        if i < len(announcements) and announcements[i]["timestamp"] == timestamp:
+            del announcements[i]
             self.save_data()
+        elif not self._remove_archived(role, timestamp):
+            return False
+        
+        if self._search_index is not None:
+            self._search_index.remove(("announcement", role, timestamp))
+        return True
     
     def get_progress_dataframe(self, role: str) -> pd.DataFrame:
         """Get progress as DataFrame for visualization"""
+        import pandas as pd
+        
         if role not in self.data["members"] or role not in self.data["resources"]:
             return pd.DataFrame()
         
@@ -295,6 +1190,222 @@ class DataManager:
             progress_data.append(row)
         
         return pd.DataFrame(progress_data).set_index("Member")
+    
+    def get_burndown_dataframe(self, role: str, days: int = 14) -> pd.DataFrame:
+        """Get remaining work and completions per day over the last `days` days"""
+        import pandas as pd
+        
+        members = self.data["members"].get(role, [])
+        tasks = [r["name"] for r in self.data["resources"].get(role, []) if r.get("requires_completion", True)]
+        if not members or not tasks:
+            return pd.DataFrame()
+        
+        progress = self.data["user_progress"].get(role, {})
+        remaining_now = sum(
+            1 for member in members for task in tasks
+            if progress.get(member, {}).get(task, "Pending") != "Completed"
+        )
+        
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today.timestamp() - (days - 1) * 86400
+        day_starts, completed = self.events.daily_completions(role, start, time.time() + 1)
+        
+        # Work remaining at the end of each day is what is open now plus everything completed since
+        completed_after = completed[::-1].cumsum()[::-1] - completed
+        return pd.DataFrame({
+            "Date": [datetime.fromtimestamp(day).date() for day in day_starts],
+            "Remaining": remaining_now + completed_after,
+            "Completed": completed
+        }).set_index("Date")
+    
+    def iter_progress_rows(self, portals: List[str] = None) -> Iterator[tuple]:
+        """Yield one (portal, member, task, status, priority, deadline) row per completable task, portal by portal"""
+        for role in (self.get_all_portals() if portals is None else portals):
+            resources = [r for r in self.data["resources"].get(role, []) if r.get("requires_completion", True)]
+            progress = self.data["user_progress"].get(role, {})
+            for member in self.data["members"].get(role, []):
+                member_progress = progress.get(member, {})
+                for resource in resources:
+                    yield (role, member, resource["name"], member_progress.get(resource["name"], "Pending"),
+                           resource.get("priority", ""), resource.get("deadline", ""))
+
+EXPORT_COLUMNS = ["Portal", "Member", "Task", "Status", "Priority", "Deadline"]
+
+EXPORT_FORMATS = {  # format -> (label, MIME type, optional module it needs)
+    "csv": ("CSV", "text/csv", None),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "pyarrow"),
+}
+
+def export_progress(data_manager: DataManager, dest, fmt: str = "csv", portals: List[str] = None, chunk_size: int = 5000) -> int:
+    """Stream progress rows for the given portals into a file path or binary file object, returning the row count"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    
+    rows = data_manager.iter_progress_rows(portals)
+    written = 0
+    
+    if fmt == "csv":
+        import csv
+        
+        binary = open(dest, "wb") if isinstance(dest, (str, Path)) else dest
+        text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+        try:
+            writer = csv.writer(text)
+            writer.writerow(EXPORT_COLUMNS)
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                writer.writerows(chunk)
+                written += len(chunk)
+            text.flush()
+        finally:
+            text.detach()
+            if binary is not dest:
+                binary.close()
+    
+    elif fmt == "xlsx":
+        from openpyxl import Workbook
+        
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Progress")
+        sheet.append(EXPORT_COLUMNS)
+        for row in rows:
+            sheet.append(row)
+            written += 1
+        workbook.save(dest)
+    
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        with pq.ParquetWriter(dest, schema) as writer:
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                columns = zip(*chunk)
+                writer.write_table(pa.table(dict(zip(EXPORT_COLUMNS, map(list, columns))), schema=schema))
+                written += len(chunk)
+    
+    return written
+
+class ReminderScheduler:
+    """Find pending tasks that are due soon or overdue and mail one digest per member"""
+    
+    def __init__(self, data_manager: DataManager, otp_manager: OTPManager, horizon_days: int = 7, overdue_days: int = 30):
+        self.data_manager = data_manager
+        self.otp_manager = otp_manager
+        self.horizon_days = horizon_days
+        self.overdue_days = overdue_days
+        self._window = None
+        self._due_by_portal: Dict[str, Dict[str, List[Dict]]] = {}  # role -> member -> items
+        self._seen_versions: Dict[str, int] = {}
+    
+    def due_items(self, today: date = None) -> Dict[tuple, List[Dict]]:
+        """Pending items per (portal, member) whose deadline falls in the reminder window
+        
+        Results are cached per portal and only recomputed for portals whose members, tasks
+        or progress changed since the last call, or for all portals when the window moves.
+        """
+        today = today or date.today()
+        start = (today - timedelta(days=self.overdue_days)).isoformat()
+        end = (today + timedelta(days=self.horizon_days)).isoformat()
+        if self._window != (start, end):
+            self._window = (start, end)
+            self._due_by_portal, self._seen_versions = {}, {}
+        
+        tasks_by_portal: Dict[str, List[tuple]] = {}
+        for deadline, role, task in self.data_manager.deadlines.between(start, end):
+            tasks_by_portal.setdefault(role, []).append((deadline, task))
+        
+        data = self.data_manager.data
+        for role in set(tasks_by_portal) | set(self._due_by_portal):
+            version = self.data_manager.portal_version(role)
+            if self._seen_versions.get(role) == version and role in self._due_by_portal:
+                continue
+            self._seen_versions[role] = version
+            
+            progress = data["user_progress"].get(role, {})
+            portal_due: Dict[str, List[Dict]] = {}
+            for deadline, task in tasks_by_portal.get(role, []):
+                for member in data["members"].get(role, []):
+                    if progress.get(member, {}).get(task, "Pending") != "Completed":
+                        portal_due.setdefault(member, []).append({
+                            "task": task,
+                            "deadline": deadline,
+                            "overdue": deadline < today.isoformat()
+                        })
+            self._due_by_portal[role] = portal_due
+        
+        return {(role, member): items
+                for role, portal_due in self._due_by_portal.items()
+                for member, items in portal_due.items()}
+    
+    def build_digests(self, today: date = None) -> tuple[Dict[str, List[tuple]], List[tuple]]:
+        """Group items not yet reminded today by recipient email; also return members without an email"""
+        today = today or date.today()
+        contacts = self.data_manager.data.get("contacts", {})
+        
+        digests: Dict[str, List[tuple]] = {}
+        missing = []
+        for (role, member), items in self.due_items(today).items():
+            items = [item for item in items
+                     if self.data_manager.last_reminded(role, member, item["task"], item["deadline"]) != today.isoformat()]
+            if not items:
+                continue
+            email = contacts.get(role, {}).get(member)
+            if email:
+                digests.setdefault(email.lower(), []).append((role, member, items))
+            else:
+                missing.append((role, member))
+        return digests, missing
+    
+    def _digest_message(self, to_email: str, entries: List[tuple]):
+        from email.message import EmailMessage
+        
+        lines = []
+        for role, member, items in entries:
+            lines.append(f"{role} Portal - {member}")
+            for item in sorted(items, key=lambda i: i["deadline"]):
+                marker = "⚠️ OVERDUE" if item["overdue"] else "📅 Due"
+                lines.append(f"  {marker} {item['deadline']}: {item['task']}")
+            lines.append("")
+        
+        msg = EmailMessage()
+        msg['Subject'] = "🐉 Dragonboat Portal - Task Reminders"
+        msg['From'] = self.otp_manager.from_mail
+        msg['To'] = to_email
+        msg.set_content("🐉 Dragonboat Team Portal - Task Reminders\n\n" + "\n".join(lines) +
+                        "---\nDragonboat Team Portal")
+        return msg
+    
+    def send_reminders(self, today: date = None) -> tuple[bool, str]:
+        """Send every digest over a single SMTP session"""
+        today = today or date.today()
+        digests, missing = self.build_digests(today)
+        skipped = f", {len(missing)} member(s) without an email skipped" if missing else ""
+        if not digests:
+            return True, f"No reminders to send{skipped}"
+        
+        sent = 0
+        reminded = []
+        try:
+            server = self.otp_manager.open_smtp()
+            try:
+                for email, entries in digests.items():
+                    server.send_message(self._digest_message(email, entries))
+                    sent += 1
+                    reminded.extend((role, member, item["task"], item["deadline"])
+                                    for role, member, items in entries for item in items)
+            finally:
+                # Record delivered digests first so a failing QUIT can't cause them to be sent again
+                if reminded:
+                    self.data_manager.record_reminders(reminded, today.isoformat())
+                try:
+                    server.quit()
+                except Exception:
+                    pass  # every message already went out; nothing is lost if the goodbye fails
+        except Exception as e:
+            return False, f"Sent {sent} of {len(digests)} reminder(s) before failing: {str(e)}"
+        
+        return True, f"Sent {sent} reminder digest(s){skipped}"
 
 class ChatGPTHelper:
     """Helper for ChatGPT API integration"""
@@ -310,6 +1421,8 @@ class ChatGPTHelper:
         full_prompt = f"{prompt}\n\nData:\n{csv_text}"
         
         try:
+            import requests
+            
             response = requests.post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={"Authorization": f"Bearer {self.api_key}"},
@@ -341,24 +1454,81 @@ def authenticate_user(credential: str, data_manager: DataManager, otp_manager: O
             return role
     return None
 
-def render_announcements(role: str, data_manager: DataManager):
-    """Render announcements section"""
-    announcements = data_manager.data["announcements"].get(role, [])
-    if not announcements:
+def render_announcement_item(ann: Dict):
+    """Render a single announcement"""
+    with st.expander(f"📅 {ann['title']} ({ann['timestamp'][:10]})"):
+        if ann.get("image_data"):
+            try:
+                image_bytes = base64.b64decode(ann["image_data"])
+                st.image(image_bytes, use_column_width=True)
+            except:
+                st.error("Image display failed")
+        st.write(ann["content"])
+
+def render_announcements(role: str, data_manager: DataManager, per_page: int = 5):
+    """Render latest announcements with paginated history"""
+    total = data_manager.count_announcements(role)
+    if not total:
         return
     
     st.markdown("### 📢 Announcements")
-    for ann in reversed(announcements[-5:]):
-        with st.expander(f"📅 {ann['title']} ({ann['timestamp'][:10]})"):
-            if ann.get("image_data"):
-                try:
-                    image_bytes = base64.b64decode(ann["image_data"])
-                    st.image(image_bytes, use_column_width=True)
-                except:
-                    st.error("Image display failed")
-            st.write(ann["content"])
+    for ann in data_manager.get_announcements(role, 0, per_page):
+        render_announcement_item(ann)
+    
+    older = total - per_page
+    if older > 0:
+        with st.expander(f"🗂️ Older announcements ({older})"):
+            pages = (older + per_page - 1) // per_page
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=f"ann_page_{role}")
+            start = per_page * page
+            for ann in data_manager.get_announcements(role, start, start + per_page):
+                render_announcement_item(ann)
     st.markdown("---")
 
+SEARCH_KINDS = {
+    "task": ("📋", "Task Management", "task_portal", "task_to_remove"),
+    "member": ("👤", "Member Management", "member_portal", "member_to_remove"),
+    "announcement": ("📢", "Announcements", "remove_ann_portal", "ann_to_remove"),
+}
+
+def jump_to_search_hit(hit: Dict):
+    """Preselect a search hit in the management tab that handles it"""
+    _, tab_name, portal_key, item_key = SEARCH_KINDS[hit["kind"]]
+    st.session_state[portal_key] = hit["portal"]
+    st.session_state[item_key] = hit["id"]
+    if hit["kind"] == "announcement":
+        position = st.session_state.data_manager.announcement_position(hit["portal"], hit["id"]) or 0
+        st.session_state.remove_ann_page = position // DataManager.HOT_ANNOUNCEMENTS + 1
+    st.session_state.search_jump = f"'{hit['title']}' ({hit['portal']}) is selected in the {tab_name} tab"
+
+def render_search(data_manager: DataManager):
+    """Render cross-portal search box with ranked hits"""
+    query = st.text_input("🔍 Search", placeholder="Search tasks, members and announcements in every portal",
+                          key="aph_search")
+    
+    if "search_jump" in st.session_state:
+        st.info(f"➡️ {st.session_state.pop('search_jump')}")
+    
+    if not query.strip():
+        return
+    
+    start = time.perf_counter()
+    hits = data_manager.search(query)
+    st.caption(f"{len(hits)} result(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    for i, hit in enumerate(hits):
+        icon = SEARCH_KINDS[hit["kind"]][0]
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            label = f"{icon} **{hit['title']}** · {hit['portal']}"
+            if hit["kind"] == "announcement":
+                label += f" · {hit['id'][:10]}"
+            st.markdown(label)
+            if hit["snippet"]:
+                st.caption(hit["snippet"])
+        with col2:
+            st.button("Go to", key=f"search_hit_{i}", on_click=jump_to_search_hit, args=(hit,))
+
 def render_login_page():
     """Login page with OTP and password options"""
     st.markdown("""
@@ -454,8 +1624,90 @@ def render_progress_visualization(role: str, data_manager: DataManager):
     df_display = df.applymap(lambda v: status_mapping.get(v, v))
     st.dataframe(df_display, use_container_width=True)
 
+def render_burndown(role: str, data_manager: DataManager, days: int):
+    """Render burndown and completion velocity charts from the progress event log"""
+    df = data_manager.get_burndown_dataframe(role, days)
+    if df.empty:
+        st.info("No burndown data available")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("Remaining tasks")
+        st.line_chart(df["Remaining"])
+    with col2:
+        st.caption("Completions per day")
+        st.bar_chart(df["Completed"])
+
+def render_progress_export(data_manager: DataManager):
+    """Render export of all portals' progress as a file download"""
+    st.markdown("### 📥 Export Progress")
+    all_portals = data_manager.get_all_portals()
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        export_portals = st.multiselect("Portals", all_portals, default=all_portals, key="export_portals")
+    with col2:
+        export_fmt = st.selectbox("Format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][0], key="export_fmt")
+    
+    module = EXPORT_FORMATS[export_fmt][2]
+    if module and importlib.util.find_spec(module) is None:
+        st.error(f"{EXPORT_FORMATS[export_fmt][0]} export needs an extra package: {module}")
+        return
+    
+    def generate() -> bytes:
+        # Rows stream into a spooled buffer that only touches disk past 8 MB and is deleted on close
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as buffer:
+            export_progress(data_manager, buffer, export_fmt, export_portals)
+            buffer.seek(0)
+            return buffer.read()
+    
+    st.download_button(
+        f"⬇️ Download {EXPORT_FORMATS[export_fmt][0]}", generate,
+        file_name=f"progress_{datetime.now():%Y%m%d}.{export_fmt}",
+        mime=EXPORT_FORMATS[export_fmt][1]
+    )
+
+def render_deadline_reminders(data_manager: DataManager):
+    """Render due/overdue task preview and batched reminder sending"""
+    st.markdown("### ⏰ Deadline Reminders")
+    
+    scheduler = st.session_state.get("reminder_scheduler")
+    if scheduler is None or scheduler.data_manager is not data_manager:
+        scheduler = st.session_state.reminder_scheduler = ReminderScheduler(data_manager, st.session_state.otp_manager)
+    scheduler.horizon_days = st.number_input("Remind about tasks due within (days)", min_value=0, max_value=60,
+                                             value=scheduler.horizon_days, key="reminder_horizon")
+    
+    contacts = data_manager.data.get("contacts", {})
+    rows = [
+        {
+            "Portal": role,
+            "Member": member,
+            "Task": item["task"],
+            "Deadline": item["deadline"],
+            "Status": "⚠️ Overdue" if item["overdue"] else "📅 Due",
+            "Email": contacts.get(role, {}).get(member, "")
+        }
+        for (role, member), items in scheduler.due_items().items()
+        for item in items
+    ]
+    if not rows:
+        st.info("No pending tasks due in this window")
+        return
+    
+    st.dataframe(rows, use_container_width=True)
+    if st.button("Send Reminders", key="send_reminders"):
+        with st.spinner("Sending reminders..."):
+            success, message = scheduler.send_reminders()
+        if success:
+            st.success(f"✅ {message}")
+        else:
+            st.error(f"❌ {message}")
+
 def render_data_analysis():
     """Render CSV upload and ChatGPT analysis"""
+    import pandas as pd
+    
     st.markdown("### 📊 Data Analysis")
     
     tab1, tab2 = st.tabs(["Upload CSV", "Paste Data"])
@@ -514,9 +1766,8 @@ def render_name_selection():
     new_name = st.text_input("Your name:")
     
     if st.button("Continue"):
-        if new_name:
-            data_manager.add_member(role, new_name)
-            st.session_state.name = new_name
+        if new_name.strip():
+            st.session_state.name = data_manager.add_member(role, new_name)
             st.rerun()
         else:
             st.warning("Please enter your name")
@@ -533,6 +1784,8 @@ def render_aph_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
+    render_search(data_manager)
+    
     render_announcements("APH", data_manager)
     
     tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
@@ -548,6 +1801,16 @@ def render_aph_dashboard():
                 render_progress_visualization(role, data_manager)
             else:
                 st.markdown(f"#### {role} Team - No members yet")
+        
+        st.markdown("### 📉 Burndown & Velocity")
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            burndown_role = st.selectbox("Portal", all_portals, key="burndown_portal")
+        with col2:
+            burndown_days = st.slider("Days", min_value=7, max_value=90, value=14, key="burndown_days")
+        render_burndown(burndown_role, data_manager, burndown_days)
+        
+        render_progress_export(data_manager)
     
     with tab2:
         st.markdown("### 📋 Task Management")
@@ -568,13 +1831,15 @@ def render_aph_dashboard():
                 requires_completion = st.checkbox("Requires Completion", value=True)
             
             if st.form_submit_button("Add Task"):
-                if task_role and task_name and task_desc:
-                    data_manager.add_resource(
+                if task_role and task_name.strip() and task_desc:
+                    if data_manager.add_resource(
                         task_role, task_name, task_url or "#", task_desc,
                         priority, deadline.strftime("%Y-%m-%d"), requires_completion
-                    )
-                    st.success(f"✅ Task added to {task_role}!")
-                    st.rerun()
+                    ):
+                        st.success(f"✅ Task added to {task_role}!")
+                        st.rerun()
+                    else:
+                        st.warning(f"⚠️ {task_role} already has a task named '{data_manager.get_task(task_role, task_name)['name']}'")
                 else:
                     st.warning("⚠️ Fill in all required fields")
         
@@ -592,6 +1857,8 @@ def render_aph_dashboard():
                     st.rerun()
             else:
                 st.info("No tasks in this portal")
+        
+        render_deadline_reminders(data_manager)
     
     with tab3:
         st.markdown("### 🏢 Portal Management")
@@ -635,10 +1902,14 @@ def render_aph_dashboard():
             member_name = st.text_input("Member Name")
             
             if st.form_submit_button("Add Member"):
-                if member_role and member_name:
-                    data_manager.add_member(member_role, member_name)
-                    st.success(f"✅ Member added to {member_role}!")
-                    st.rerun()
+                if member_role and member_name.strip():
+                    existing = data_manager.get_member(member_role, member_name)
+                    if existing is not None:
+                        st.warning(f"⚠️ '{existing}' is already a member of {member_role}")
+                    else:
+                        data_manager.add_member(member_role, member_name)
+                        st.success(f"✅ Member added to {member_role}!")
+                        st.rerun()
                 else:
                     st.warning("⚠️ Please fill in both fields")
         
@@ -656,6 +1927,19 @@ def render_aph_dashboard():
                     st.rerun()
             else:
                 st.info("No members in this portal")
+        
+        # Member Email
+        st.markdown("#### Reminder Email")
+        with st.form("member_email_form"):
+            email_role = st.selectbox("Portal", all_portals, key="email_portal")
+            email_member = st.text_input("Member Name", key="email_member")
+            email_address = st.text_input("Email (leave empty to clear)", key="email_address")
+            
+            if st.form_submit_button("Save Email"):
+                if data_manager.set_member_email(email_role, email_member, email_address):
+                    st.success(f"✅ Reminder email updated for {data_manager.get_member(email_role, email_member)}!")
+                else:
+                    st.warning(f"⚠️ No member named '{email_member}' in {email_role}")
     
     with tab5:
         st.markdown("### 📢 Announcement Management")
@@ -688,15 +1972,24 @@ def render_aph_dashboard():
         all_portals = data_manager.get_all_portals()
         portal_for_ann = st.selectbox("Select Portal", [""] + all_portals, key="remove_ann_portal")
 
-        if portal_for_ann and portal_for_ann in data_manager.data.get("announcements", {}):
-            announcements = data_manager.data["announcements"][portal_for_ann]
-            if announcements:
-                ann_titles = [ann["title"] for ann in announcements]
-                ann_to_remove = st.selectbox("Select Announcement to Remove", [""] + ann_titles, key="ann_to_remove")
+        if portal_for_ann:
+            total = data_manager.count_announcements(portal_for_ann)
+            if total:
+                per_page = DataManager.HOT_ANNOUNCEMENTS
+                page = 1
+                if total > per_page:
+                    # Seeded through session_state (not value=) because search jumps set this page
+                    pages = (total + per_page - 1) // per_page
+                    st.session_state.remove_ann_page = min(st.session_state.get("remove_ann_page", 1), pages)
+                    page = st.number_input("Page", min_value=1, max_value=pages, key="remove_ann_page")
+                announcements = data_manager.get_announcements(portal_for_ann, per_page * (page - 1), per_page * page)
+                ann_labels = {ann["timestamp"]: f"{ann['title']} ({ann['timestamp'][:10]})" for ann in announcements}
+                ann_to_remove = st.selectbox("Select Announcement to Remove", [""] + list(ann_labels),
+                                             format_func=lambda ts: ann_labels.get(ts, ""), key="ann_to_remove")
                 
                 if ann_to_remove and st.button("Remove Announcement", type="secondary"):
                     data_manager.remove_announcement(portal_for_ann, ann_to_remove)
-                    st.success(f"✅ Announcement '{ann_to_remove}' removed from {portal_for_ann}!")
+                    st.success(f"✅ Announcement '{ann_labels[ann_to_remove]}' removed from {portal_for_ann}!")
                     st.rerun()
             else:
                 st.info("No announcements in this portal")
@@ -738,10 +2031,7 @@ def render_team_dashboard():
             
             if resource.get('requires_completion', True):
                 # Ensure user progress structure exists
-                if role not in data_manager.data["user_progress"]:
-                    data_manager.data["user_progress"][role] = {}
-                if name not in data_manager.data["user_progress"][role]:
-                    data_manager.data["user_progress"][role][name] = {}
+                data_manager.ensure_member_progress(role, name)
                 
                 current_status = data_manager.data["user_progress"][role][name].get(resource['name'], 'Pending')
                 
@@ -814,6 +2104,9 @@ def main():
     
     init_session_state()
     
+    for error in st.session_state.data_manager.pop_write_errors():
+        st.error(f"Save failed: {error}")
+    
     try:
         if st.session_state.role is None:
             render_login_page()
@@ -845,6 +2138,7 @@ def main():
             
             with col3:
                 if st.button("🔓 Logout"):
+                    st.session_state.data_manager.close()
                     for key in list(st.session_state.keys()):
                         del st.session_state[key]
                     st.rerun()
@@ -856,5 +2150,149 @@ def main():
         if st.checkbox("Show Debug Info"):
             st.exception(e)
 
+def cli_report(data_manager: DataManager, portals: List[str], days: int):
+    """Print a progress summary per portal"""
+    scheduler = ReminderScheduler(data_manager, None, horizon_days=days)
+    due = scheduler.due_items()
+    since = time.time() - days * 86400
+    
+    print(f"{'Portal':<20} {'Members':>7} {'Tasks':>5} {'Done':>9} {'Due':>5} {'Overdue':>7} {'Completed ' + str(days) + 'd':>14}")
+    for role in portals:
+        members = data_manager.data["members"].get(role, [])
+        tasks = [r["name"] for r in data_manager.data["resources"].get(role, []) if r.get("requires_completion", True)]
+        progress = data_manager.data["user_progress"].get(role, {})
+        total = len(members) * len(tasks)
+        done = sum(1 for member in members for task in tasks if progress.get(member, {}).get(task) == "Completed")
+        items = [item for (portal, _), member_items in due.items() if portal == role for item in member_items]
+        overdue = sum(1 for item in items if item["overdue"])
+        
+        events = data_manager.events.query(role, since)
+        completed = int((events["status"] == ProgressEventLog.STATUSES.index("Completed")).sum()) if len(events["ts"]) else 0
+        
+        percent = f"{done / total:.0%}" if total else "-"
+        print(f"{role:<20} {len(members):>7} {len(tasks):>5} {f'{done}/{total}':>5} {percent:>3} "
+              f"{len(items) - overdue:>5} {overdue:>7} {completed:>14}")
+
+IMPORT_ACTIONS = ["add_portal", "add_member", "remove_member", "add_task", "remove_task", "set_status", "set_email"]
+
+def cli_import(data_manager: DataManager, path: str) -> Dict[str, int]:
+    """Apply a CSV of admin actions in one transaction; any bad row aborts the whole import"""
+    import csv
+    
+    counts = {action: 0 for action in IMPORT_ACTIONS}
+    with open(path, newline="", encoding="utf-8") as f, data_manager.batch():
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            action = (row.get("action") or "").strip()
+            portal = (row.get("portal") or "").strip()
+            name = (row.get("name") or "").strip()
+            if action not in counts:
+                raise ValueError(f"line {line}: unknown action '{action}'")
+            if not portal or (not name and action != "add_portal"):
+                raise ValueError(f"line {line}: portal and name are required")
+            
+            if action != "add_portal" and portal not in data_manager.get_all_portals():
+                raise ValueError(f"line {line}: unknown portal '{portal}'")
+            
+            if action == "add_portal":
+                password = (row.get("password") or "").strip()
+                if not password:
+                    raise ValueError(f"line {line}: add_portal needs a password column")
+                if portal in data_manager.data["passwords"] or portal == "APH":
+                    raise ValueError(f"line {line}: portal '{portal}' already exists")
+                data_manager.add_portal(portal, password)
+            elif action == "add_member":
+                data_manager.add_member(portal, name)
+            elif action == "remove_member":
+                data_manager.remove_member(portal, name)
+            elif action == "add_task":
+                deadline = (row.get("deadline") or "").strip()
+                if deadline:
+                    try:
+                        deadline = date.fromisoformat(deadline).isoformat()
+                    except ValueError:
+                        raise ValueError(f"line {line}: deadline '{deadline}' is not a YYYY-MM-DD date") from None
+                if not data_manager.add_resource(
+                    portal, name, row.get("url") or "#", row.get("description") or "",
+                    row.get("priority") or "Medium", deadline,
+                    (row.get("requires_completion") or "true").strip().lower() not in ("false", "0", "no")
+                ):
+                    raise ValueError(f"line {line}: {portal} already has a task named '{data_manager.get_task(portal, name)['name']}'")
+            elif action == "remove_task":
+                data_manager.remove_task(portal, name)
+            elif action == "set_status":
+                member = data_manager.get_member(portal, name)
+                task = data_manager.get_task(portal, row.get("task") or "")
+                if member is None or task is None or row.get("status") not in ProgressEventLog.STATUSES:
+                    raise ValueError(f"line {line}: unknown member, task or status")
+                data_manager.update_progress(portal, member, task["name"], row["status"])
+            elif action == "set_email":
+                if not data_manager.set_member_email(portal, name, row.get("email") or ""):
+                    raise ValueError(f"line {line}: unknown member '{name}'")
+            
+            counts[action] += 1
+            if (line - 1) % 1000 == 0:
+                print(f"  {line - 1} rows applied...", file=sys.stderr)
+    return counts
+
+def cli(argv: List[str]) -> int:
+    """Headless entry point for reports and admin batch jobs"""
+    parser = argparse.ArgumentParser(prog="App3.py", description="Dragonboat Team Portal admin commands")
+    parser.add_argument("--data", default="portal_data.json", help="portal data file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    report = commands.add_parser("report", help="print a progress summary")
+    report.add_argument("--portal", action="append", help="limit to this portal (repeatable)")
+    report.add_argument("--days", type=int, default=7, help="due-soon and velocity window")
+    
+    import_cmd = commands.add_parser("import", help="apply a CSV of admin actions in one transaction")
+    import_cmd.add_argument("file", help=f"CSV with columns action,portal,name,password,task,status,email,... (actions: {', '.join(IMPORT_ACTIONS)})")
+    
+    export = commands.add_parser("export", help="stream progress rows to a file")
+    export.add_argument("output", help="output path, or - for CSV on stdout")
+    export.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+    export.add_argument("--portal", action="append", help="limit to this portal (repeatable)")
+    
+    commands.add_parser("compact", help="trim the event log and archive old announcements")
+    
+    args = parser.parse_args(argv)
+    data_manager = DataManager(args.data, write_latency=0)
+    try:
+        unknown = [role for role in getattr(args, "portal", None) or [] if role not in data_manager.get_all_portals()]
+        if unknown:
+            raise ValueError(f"unknown portal(s): {', '.join(unknown)}")
+        
+        if args.command == "report":
+            cli_report(data_manager, args.portal or data_manager.get_all_portals(), args.days)
+        
+        elif args.command == "import":
+            start = time.perf_counter()
+            counts = cli_import(data_manager, args.file)
+            summary = ", ".join(f"{action}={count}" for action, count in counts.items() if count)
+            print(f"Imported {sum(counts.values())} rows in {time.perf_counter() - start:.2f}s ({summary or 'nothing to do'})")
+        
+        elif args.command == "export":
+            if args.output == "-" and args.format != "csv":
+                parser.error("only CSV can be written to stdout")
+            dest = sys.stdout.buffer if args.output == "-" else args.output
+            rows = export_progress(data_manager, dest, args.format, args.portal)
+            print(f"Exported {rows} rows", file=sys.stderr)
+        
+        elif args.command == "compact":
+            result = data_manager.compact()
+            print(f"Removed {result['events_removed']} stale events, "
+                  f"archived {result['announcements_archived']} announcements")
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        data_manager.close()
+    
+    errors = data_manager.pop_write_errors()
+    for error in errors:
+        print(f"Save failed: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     main()
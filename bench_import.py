@@ -0,0 +1,48 @@
+"""Cold-start import benchmark for App3.
+
+Every new Streamlit server process pays the module import cost before the
+login page can render. This compares importing App3 as it is now (heavy
+dependencies deferred) against importing it together with the modules it
+used to load eagerly.
+
+Usage: python bench_import.py [runs]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+EAGER_MODULES = ["pandas", "requests", "smtplib", "email.message"]
+
+CASES = {
+    "deferred (login path)": "import App3",
+    "eager (previous layout)": "import App3; " + "; ".join(f"import {m}" for m in EAGER_MODULES),
+}
+
+
+def time_import(statement: str, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {}
+    for label, statement in CASES.items():
+        timings = time_import(statement, runs)
+        results[label] = statistics.median(timings)
+        print(f"{label:<26} median {results[label] * 1000:8.1f} ms  "
+              f"min {min(timings) * 1000:8.1f} ms  ({runs} runs)")
+
+    deferred, eager = results.values()
+    print(f"{'cold-start gain':<26} {(eager - deferred) * 1000:8.1f} ms "
+          f"({(1 - deferred / eager) * 100:.0f}% faster)")
+
+
+if __name__ == "__main__":
+    main()